@@ -665,12 +665,16 @@ if __name__ == '__main__':
         with open(script_path, 'w') as f:
             f.write(agent_script)
         
-        # Create virtual environment
+        # Create virtual environment, preferring uv when it is installed
         venv_path = deployment_path / "venv"
-        subprocess.run([sys.executable, "-m", "venv", str(venv_path)], check=True)
+        python_path = venv_path / ("Scripts" if sys.platform == "win32" else "bin") / "python"
+        uv_path = shutil.which("uv")
+        if uv_path:
+            subprocess.run([uv_path, "venv", "--python", sys.executable, str(venv_path)], check=True)
+        else:
+            subprocess.run([sys.executable, "-m", "venv", str(venv_path)], check=True)
         
         # Install requirements
-        pip_path = venv_path / ("Scripts" if sys.platform == "win32" else "bin") / "pip"
         requirements = [
             "flask",
             "flask-cors",
@@ -683,11 +687,14 @@ if __name__ == '__main__':
         for mcp in agent.get('mcp_tools', []):
             requirements.append(mcp['mcp_tool']['package_name'])
         
-        subprocess.run([str(pip_path), "install"] + requirements, check=True)
+        if uv_path:
+            subprocess.run([uv_path, "pip", "install", "--python", str(python_path)] + requirements, check=True)
+        else:
+            pip_path = venv_path / ("Scripts" if sys.platform == "win32" else "bin") / "pip"
+            subprocess.run([str(pip_path), "install"] + requirements, check=True)
         
         # Create start script
         start_script = deployment_path / "start.sh"
-        python_path = venv_path / ("Scripts" if sys.platform == "win32" else "bin") / "python"
         
         with open(start_script, 'w') as f:
             f.write(f'''#!/bin/bash
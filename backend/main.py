@@ -1,17 +1,25 @@
 # main.py
 from fastapi import FastAPI, HTTPException, Depends, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, Column, Integer, String, Text, Boolean, ForeignKey, DateTime, JSON
+from fastapi.responses import ORJSONResponse, Response
+from contextlib import asynccontextmanager
+from sqlalchemy import select, delete, func, inspect, bindparam, exists, event, Column, Integer, String, Text, Boolean, ForeignKey, DateTime, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import Session, sessionmaker, relationship
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import relationship, selectinload, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession, async_scoped_session, async_sessionmaker, create_async_engine
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from pydantic import BaseModel
+from jinja2 import Environment
+from cachetools import TTLCache
+from serializers import agent_rows_to_dicts
 from typing import List, Optional, Dict, Any
 import json
+import orjson
 import os
+import sys
 import subprocess
 import shutil
-import uuid
+import uuid_utils
 from datetime import datetime
 import asyncio
 import logging
@@ -22,9 +30,30 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///./agent_platform.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./agent_platform.db"
+engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False, "timeout": 30},
+    pool_size=10,
+    max_overflow=20,
+    pool_pre_ping=True,
+)
+
+@event.listens_for(engine.sync_engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers proceed while a writer holds the lock
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+# One session per asyncio task: each request (and each background deployment
+# task) gets its own session, and remove() hands its connection back to the pool
+SessionLocal = async_scoped_session(
+    async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False),
+    scopefunc=asyncio.current_task,
+)
 Base = declarative_base()
 
 # Database Models
@@ -61,6 +90,7 @@ class Agent(Base):
 
 class AgentMCPAssociation(Base):
     __tablename__ = "agent_mcp_associations"
+    __table_args__ = (Index("ix_amcp_agent_tool", "agent_id", "mcp_tool_id", unique=True),)
     
     id = Column(Integer, primary_key=True, index=True)
     agent_id = Column(String, ForeignKey("agents.agent_id"))
@@ -74,6 +104,7 @@ class AgentMCPAssociation(Base):
 
 class Deployment(Base):
     __tablename__ = "deployments"
+    __table_args__ = (Index("ix_deploy_agent", "agent_id"),)
     
     id = Column(Integer, primary_key=True, index=True)
     deployment_id = Column(String, unique=True, index=True)
@@ -98,11 +129,103 @@ class RemoteConfig(Base):
     ssh_key_path = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Hot lookups are built once with bound parameters so each request reuses
+# the same statement object (and its compiled-cache entry)
+_agent_by_id_stmt = select(Agent).where(Agent.agent_id == bindparam("aid"))
+# Deployment needs the agent's tools; load them up front since async
+# sessions can't lazy-load on attribute access
+_agent_with_tools_by_id_stmt = _agent_by_id_stmt.options(
+    selectinload(Agent.mcp_associations).joinedload(AgentMCPAssociation.mcp_tool)
+)
+_mcp_tool_by_id_stmt = select(MCPTool).where(MCPTool.id == bindparam("tid"))
+# Agent, MCP tool and duplicate check in one round trip: no row means the
+# agent is missing, a NULL tool means the tool is missing
+_agent_and_tool_stmt = (
+    select(
+        Agent.id,
+        MCPTool,
+        exists().where(
+            AgentMCPAssociation.agent_id == Agent.agent_id,
+            AgentMCPAssociation.mcp_tool_id == bindparam("tid")
+        ).label("already_associated")
+    )
+    .outerjoin(MCPTool, MCPTool.id == bindparam("tid"))
+    .where(Agent.agent_id == bindparam("aid"))
+)
+_association_by_id_stmt = select(AgentMCPAssociation).where(
+    AgentMCPAssociation.id == bindparam("assoc_id"),
+    AgentMCPAssociation.agent_id == bindparam("aid")
+)
+_deployment_by_id_stmt = select(Deployment).where(Deployment.deployment_id == bindparam("did"))
+
+# Agents with their MCP tools as flat rows (one per association) so read
+# endpoints build payloads without hydrating ORM objects. Column order is
+# relied on by serializers.agent_rows_to_dicts
+_agent_rows_stmt = (
+    select(
+        Agent.id,
+        Agent.agent_id,
+        Agent.name,
+        Agent.instruction,
+        Agent.model_name,
+        Agent.agent_type,
+        Agent.usecase_id,
+        Agent.position_x,
+        Agent.position_y,
+        Agent.created_at,
+        AgentMCPAssociation.id.label("association_id"),
+        AgentMCPAssociation.env_values,
+        MCPTool.id.label("mcp_tool_id"),
+        MCPTool.name.label("mcp_tool_name"),
+        MCPTool.package_name
+    )
+    .outerjoin(AgentMCPAssociation, AgentMCPAssociation.agent_id == Agent.agent_id)
+    .outerjoin(MCPTool, MCPTool.id == AgentMCPAssociation.mcp_tool_id)
+    .order_by(Agent.id, AgentMCPAssociation.id)
+)
+_agent_rows_by_id_stmt = _agent_rows_stmt.where(Agent.agent_id == bindparam("aid"))
+
+def drop_duplicate_rows(connection, index):
+    # Rows that would violate a new unique index; keep the oldest of each group
+    table = index.table
+    columns = list(index.columns)
+    keep_ids = select(func.min(table.c.id)).group_by(*columns)
+    result = connection.execute(
+        delete(table).where(
+            table.c.id.not_in(keep_ids),
+            *(column.is_not(None) for column in columns)
+        )
+    )
+    if result.rowcount:
+        logger.warning(
+            f"Removed {result.rowcount} duplicate rows from {table.name} "
+            f"before creating unique index {index.name}"
+        )
+
+def create_missing_indexes(connection):
+    # create_all skips tables that already exist, so indexes added to a
+    # model later have to be created explicitly on older databases
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            if index.unique:
+                drop_duplicate_rows(connection, index)
+            index.create(connection)
+
+# Create tables on startup
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_missing_indexes)
+    yield
+    await engine.dispose()
 
 # FastAPI app
-app = FastAPI(title="Agent Authoring Platform API")
+app = FastAPI(title="Agent Authoring Platform API", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -114,33 +237,70 @@ app.add_middleware(
 )
 
 # Dependency
-def get_db():
+async def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        await SessionLocal.remove()
 
 # WebSocket manager for logs
 class ConnectionManager:
-    def __init__(self):
+    """Buffers log entries per client and sends them in batches, one frame per flush"""
+
+    def __init__(self, flush_interval: float = 0.02, max_pending: int = 1024):
         self.active_connections: Dict[str, WebSocket] = {}
+        self.pending_logs: Dict[str, asyncio.Queue] = {}
+        self.flush_tasks: Dict[str, asyncio.Task] = {}
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
 
     async def connect(self, websocket: WebSocket, client_id: str):
         await websocket.accept()
+        self.disconnect(client_id)
+        queue = asyncio.Queue(maxsize=self.max_pending)
         self.active_connections[client_id] = websocket
+        self.pending_logs[client_id] = queue
+        self.flush_tasks[client_id] = asyncio.create_task(self._flush_logs(websocket, queue))
 
     def disconnect(self, client_id: str):
         if client_id in self.active_connections:
             del self.active_connections[client_id]
+        self.pending_logs.pop(client_id, None)
+        flush_task = self.flush_tasks.pop(client_id, None)
+        if flush_task:
+            flush_task.cancel()
 
     async def send_log(self, client_id: str, message: str, level: str = "info"):
-        if client_id in self.active_connections:
-            await self.active_connections[client_id].send_json({
-                "timestamp": datetime.utcnow().isoformat(),
-                "level": level,
-                "message": message
-            })
+        queue = self.pending_logs.get(client_id)
+        if queue is None:
+            return
+        
+        # Drop the oldest entry rather than stall the producer on a slow client
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait({
+            "timestamp": datetime.utcnow(),
+            "level": level,
+            "message": message
+        })
+
+    async def _flush_logs(self, websocket: WebSocket, queue: asyncio.Queue):
+        while True:
+            batch = [await queue.get()]
+            await asyncio.sleep(self.flush_interval)
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            
+            try:
+                await websocket.send_text(orjson.dumps(batch).decode())
+            except Exception as e:
+                logger.warning(f"Stopped sending logs to disconnected client: {str(e)}")
+                return
+
+    async def broadcast_log(self, message: str, level: str = "info"):
+        for client_id in list(self.active_connections):
+            await self.send_log(client_id, message, level)
 
 manager = ConnectionManager()
 
@@ -201,166 +361,155 @@ class RemoteConfigCreate(BaseModel):
 
 # API Endpoints
 
+# Pre-serialized GET /api/agents/{agent_id} bodies. Writes in this process
+# invalidate their entry; the TTL bounds staleness across worker processes
+_agent_response_cache = TTLCache(maxsize=1024, ttl=10)
+# Bumped on every invalidation; a read only caches its body if no write
+# landed while its query was in flight
+_agent_cache_generation = 0
+
+def invalidate_agent_response(agent_id: Optional[str] = None):
+    global _agent_cache_generation
+    _agent_cache_generation += 1
+    if agent_id is None:
+        _agent_response_cache.clear()
+    else:
+        _agent_response_cache.pop(agent_id, None)
+
 # MCP Tools Management
-@app.post("/api/mcp-tools", response_model=MCPToolResponse)
-def create_mcp_tool(tool: MCPToolCreate, db: Session = Depends(get_db)):
+# Create endpoints build the response from the committed row (id and
+# created_at are populated on flush) and skip response-model validation
+@app.post("/api/mcp-tools", status_code=201, responses={201: {"model": MCPToolResponse}})
+async def create_mcp_tool(tool: MCPToolCreate, db: AsyncSession = Depends(get_db)):
     db_tool = MCPTool(**tool.dict())
     db.add(db_tool)
-    db.commit()
-    db.refresh(db_tool)
-    return db_tool
+    await db.commit()
+    return ORJSONResponse(status_code=201, content={
+        "id": db_tool.id,
+        "name": db_tool.name,
+        "package_name": db_tool.package_name,
+        "description": db_tool.description,
+        "env_variables": db_tool.env_variables,
+        "created_at": db_tool.created_at
+    })
 
 @app.get("/api/mcp-tools", response_model=List[MCPToolResponse])
-def list_mcp_tools(db: Session = Depends(get_db)):
-    return db.query(MCPTool).all()
+async def list_mcp_tools(db: AsyncSession = Depends(get_db)):
+    return (await db.scalars(select(MCPTool))).all()
 
 @app.get("/api/mcp-tools/{tool_id}", response_model=MCPToolResponse)
-def get_mcp_tool(tool_id: int, db: Session = Depends(get_db)):
-    tool = db.query(MCPTool).filter(MCPTool.id == tool_id).first()
+async def get_mcp_tool(tool_id: int, db: AsyncSession = Depends(get_db)):
+    tool = await db.scalar(_mcp_tool_by_id_stmt, {"tid": tool_id})
     if not tool:
         raise HTTPException(status_code=404, detail="MCP tool not found")
     return tool
 
 @app.delete("/api/mcp-tools/{tool_id}")
-def delete_mcp_tool(tool_id: int, db: Session = Depends(get_db)):
-    tool = db.query(MCPTool).filter(MCPTool.id == tool_id).first()
+async def delete_mcp_tool(tool_id: int, db: AsyncSession = Depends(get_db)):
+    tool = await db.scalar(_mcp_tool_by_id_stmt, {"tid": tool_id})
     if not tool:
         raise HTTPException(status_code=404, detail="MCP tool not found")
-    db.delete(tool)
-    db.commit()
+    await db.delete(tool)
+    await db.commit()
+    # Cached agent payloads may embed this tool
+    invalidate_agent_response()
     return {"message": "MCP tool deleted"}
 
 # Agents Management
-@app.post("/api/agents", response_model=AgentResponse)
-def create_agent(agent: AgentCreate, db: Session = Depends(get_db)):
-    agent_id = str(uuid.uuid4())
+@app.post("/api/agents", status_code=201, responses={201: {"model": AgentResponse}})
+async def create_agent(agent: AgentCreate, db: AsyncSession = Depends(get_db)):
+    agent_id = str(uuid_utils.uuid7())
     db_agent = Agent(agent_id=agent_id, **agent.dict())
     db.add(db_agent)
-    db.commit()
-    db.refresh(db_agent)
-    return db_agent
-
-@app.get("/api/agents", response_model=List[AgentResponse])
-def list_agents(db: Session = Depends(get_db)):
-    agents = db.query(Agent).all()
-    result = []
-    for agent in agents:
-        agent_dict = {
-            "id": agent.id,
-            "agent_id": agent.agent_id,
-            "name": agent.name,
-            "instruction": agent.instruction,
-            "model_name": agent.model_name,
-            "agent_type": agent.agent_type,
-            "usecase_id": agent.usecase_id,
-            "position_x": agent.position_x,
-            "position_y": agent.position_y,
-            "created_at": agent.created_at,
-            "mcp_tools": []
-        }
-        
-        for assoc in agent.mcp_associations:
-            agent_dict["mcp_tools"].append({
-                "association_id": assoc.id,
-                "mcp_tool": {
-                    "id": assoc.mcp_tool.id,
-                    "name": assoc.mcp_tool.name,
-                    "package_name": assoc.mcp_tool.package_name
-                },
-                "env_values": assoc.env_values
-            })
-        
-        result.append(agent_dict)
-    
-    return result
-
-@app.get("/api/agents/{agent_id}", response_model=AgentResponse)
-def get_agent(agent_id: str, db: Session = Depends(get_db)):
-    agent = db.query(Agent).filter(Agent.agent_id == agent_id).first()
-    if not agent:
-        raise HTTPException(status_code=404, detail="Agent not found")
-    
-    agent_dict = {
-        "id": agent.id,
-        "agent_id": agent.agent_id,
-        "name": agent.name,
-        "instruction": agent.instruction,
-        "model_name": agent.model_name,
-        "agent_type": agent.agent_type,
-        "usecase_id": agent.usecase_id,
-        "position_x": agent.position_x,
-        "position_y": agent.position_y,
-        "created_at": agent.created_at,
+    await db.commit()
+    return ORJSONResponse(status_code=201, content={
+        "id": db_agent.id,
+        "agent_id": db_agent.agent_id,
+        "name": db_agent.name,
+        "instruction": db_agent.instruction,
+        "model_name": db_agent.model_name,
+        "agent_type": db_agent.agent_type,
+        "usecase_id": db_agent.usecase_id,
+        "position_x": db_agent.position_x,
+        "position_y": db_agent.position_y,
+        "created_at": db_agent.created_at,
         "mcp_tools": []
-    }
-    
-    for assoc in agent.mcp_associations:
-        agent_dict["mcp_tools"].append({
-            "association_id": assoc.id,
-            "mcp_tool": {
-                "id": assoc.mcp_tool.id,
-                "name": assoc.mcp_tool.name,
-                "package_name": assoc.mcp_tool.package_name
-            },
-            "env_values": assoc.env_values
-        })
+    })
+
+# The read endpoints return ORJSONResponse directly; the response models are
+# only listed for the OpenAPI schema so FastAPI never runs them per request
+@app.get("/api/agents", responses={200: {"model": List[AgentResponse]}})
+async def list_agents(db: AsyncSession = Depends(get_db)):
+    result = agent_rows_to_dicts(await db.execute(_agent_rows_stmt))
+    return ORJSONResponse(content=result)
+
+@app.get("/api/agents/{agent_id}", responses={200: {"model": AgentResponse}})
+async def get_agent(agent_id: str, db: AsyncSession = Depends(get_db)):
+    body = _agent_response_cache.get(agent_id)
+    if body is None:
+        generation = _agent_cache_generation
+        result = agent_rows_to_dicts(await db.execute(_agent_rows_by_id_stmt, {"aid": agent_id}))
+        if not result:
+            raise HTTPException(status_code=404, detail="Agent not found")
+        
+        body = orjson.dumps(result[0])
+        if generation == _agent_cache_generation:
+            _agent_response_cache[agent_id] = body
     
-    return agent_dict
+    return Response(content=body, media_type="application/json")
 
 @app.put("/api/agents/{agent_id}")
-def update_agent(agent_id: str, agent_update: AgentCreate, db: Session = Depends(get_db)):
-    agent = db.query(Agent).filter(Agent.agent_id == agent_id).first()
+async def update_agent(agent_id: str, agent_update: AgentCreate, db: AsyncSession = Depends(get_db)):
+    agent = await db.scalar(_agent_by_id_stmt, {"aid": agent_id})
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
     for key, value in agent_update.dict().items():
         setattr(agent, key, value)
     
-    db.commit()
-    db.refresh(agent)
+    await db.commit()
+    invalidate_agent_response(agent_id)
+    await db.refresh(agent)
     return agent
 
 @app.delete("/api/agents/{agent_id}")
-def delete_agent(agent_id: str, db: Session = Depends(get_db)):
-    agent = db.query(Agent).filter(Agent.agent_id == agent_id).first()
+async def delete_agent(agent_id: str, db: AsyncSession = Depends(get_db)):
+    agent = await db.scalar(_agent_by_id_stmt, {"aid": agent_id})
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
-    db.delete(agent)
-    db.commit()
+    await db.delete(agent)
+    await db.commit()
+    invalidate_agent_response(agent_id)
     return {"message": "Agent deleted"}
 
 # Agent-MCP Association
 @app.post("/api/agents/{agent_id}/mcp-tools")
-def add_mcp_to_agent(agent_id: str, association: AgentMCPCreate, db: Session = Depends(get_db)):
+async def add_mcp_to_agent(agent_id: str, association: AgentMCPCreate, db: AsyncSession = Depends(get_db)):
     logger.info(f"Adding MCP tool to agent {agent_id} with data: {association}")
     
-    # Check if agent exists
-    agent = db.query(Agent).filter(Agent.agent_id == agent_id).first()
-    if not agent:
+    # Check that the agent and MCP tool exist and aren't already associated
+    row = (await db.execute(
+        _agent_and_tool_stmt, {"aid": agent_id, "tid": association.mcp_tool_id}
+    )).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Agent not found")
     
-    # Check if MCP tool exists
-    mcp_tool = db.query(MCPTool).filter(MCPTool.id == association.mcp_tool_id).first()
+    mcp_tool = row.MCPTool
     if not mcp_tool:
         raise HTTPException(status_code=404, detail="MCP tool not found")
     
     logger.info(f"Found MCP tool: {mcp_tool.name} with env_variables: {mcp_tool.env_variables}")
     
-    # Check if tool is already associated with the agent
-    existing_association = db.query(AgentMCPAssociation).filter(
-        AgentMCPAssociation.agent_id == agent_id,
-        AgentMCPAssociation.mcp_tool_id == association.mcp_tool_id
-    ).first()
-    if existing_association:
+    if row.already_associated:
         raise HTTPException(
             status_code=409,
             detail=f"MCP tool {mcp_tool.name} is already associated with this agent"
         )
 
     # Validate environment variables
-    if mcp_tool.env_variables:
-        required_vars = set(mcp_tool.env_variables)
-        provided_vars = set(association.env_values.keys() if association.env_values else {})
+    required_vars = frozenset(mcp_tool.env_variables or ())
+    if required_vars:
+        provided_vars = association.env_values.keys()
         
         # Check for missing required variables
         missing_vars = required_vars - provided_vars
@@ -386,89 +535,51 @@ def add_mcp_to_agent(agent_id: str, association: AgentMCPCreate, db: Session = D
                 detail=f"Empty values provided for environment variables: {', '.join(empty_vars)}"
             )
             
-    # Create the association
-    agent_mcp = AgentMCPAssociation(
-        agent_id=agent_id,
-        mcp_tool_id=association.mcp_tool_id,
-        env_values=association.env_values
+    # Create the association; the unique index turns a concurrent duplicate into a no-op
+    association_id = await db.scalar(
+        sqlite_insert(AgentMCPAssociation)
+        .values(
+            agent_id=agent_id,
+            mcp_tool_id=association.mcp_tool_id,
+            env_values=association.env_values
+        )
+        .on_conflict_do_nothing(index_elements=["agent_id", "mcp_tool_id"])
+        .returning(AgentMCPAssociation.id)
     )
-    
-    try:
-        db.add(agent_mcp)
-        db.commit()
-        db.refresh(agent_mcp)
-        return agent_mcp
-    except IntegrityError:
-        db.rollback()
+    if association_id is None:
         raise HTTPException(
             status_code=409,
-            detail="This MCP tool is already associated with this agent"
-        )
-    
-    # Validate environment variables
-    required_env_vars = set(mcp_tool.env_variables)
-    provided_env_vars = set(association.env_values.keys())
-    
-    # Check for missing required variables
-    missing_vars = required_env_vars - provided_env_vars
-    if missing_vars:
-        raise HTTPException(
-            status_code=422,
-            detail=f"Missing required environment variables: {', '.join(missing_vars)}"
-        )
-    
-    # Check for extra variables that weren't defined in the tool
-    extra_vars = provided_env_vars - required_env_vars
-    if extra_vars:
-        raise HTTPException(
-            status_code=422,
-            detail=f"Unknown environment variables provided: {', '.join(extra_vars)}"
-        )
-    
-    # Validate that no env values are empty
-    empty_vars = [k for k, v in association.env_values.items() if not v or not v.strip()]
-    if empty_vars:
-        raise HTTPException(
-            status_code=422,
-            detail=f"Empty values provided for environment variables: {', '.join(empty_vars)}"
+            detail=f"MCP tool {mcp_tool.name} is already associated with this agent"
         )
     
-    # Create association
-    db_association = AgentMCPAssociation(
-        agent_id=agent_id,
-        mcp_tool_id=association.mcp_tool_id,
-        env_values=association.env_values
-    )
-    db.add(db_association)
-    db.commit()
-    db.refresh(db_association)
-    
-    return {"message": "MCP tool added to agent", "association_id": db_association.id}
+    await db.commit()
+    invalidate_agent_response(agent_id)
+    return {"message": "MCP tool added to agent", "association_id": association_id}
 
 @app.delete("/api/agents/{agent_id}/mcp-tools/{association_id}")
-def remove_mcp_from_agent(agent_id: str, association_id: int, db: Session = Depends(get_db)):
-    association = db.query(AgentMCPAssociation).filter(
-        AgentMCPAssociation.id == association_id,
-        AgentMCPAssociation.agent_id == agent_id
-    ).first()
+async def remove_mcp_from_agent(agent_id: str, association_id: int, db: AsyncSession = Depends(get_db)):
+    association = await db.scalar(
+        _association_by_id_stmt, {"assoc_id": association_id, "aid": agent_id}
+    )
     
     if not association:
         raise HTTPException(status_code=404, detail="Association not found")
     
-    db.delete(association)
-    db.commit()
+    await db.delete(association)
+    await db.commit()
+    invalidate_agent_response(agent_id)
     
     return {"message": "MCP tool removed from agent"}
 
 # Deployment
 @app.post("/api/deployments")
-async def deploy_agent(deployment: DeploymentCreate, db: Session = Depends(get_db)):
+async def deploy_agent(deployment: DeploymentCreate, db: AsyncSession = Depends(get_db)):
     # Get agent details
-    agent = db.query(Agent).filter(Agent.agent_id == deployment.agent_id).first()
+    agent = await db.scalar(_agent_by_id_stmt, {"aid": deployment.agent_id})
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
-    deployment_id = str(uuid.uuid4())
+    deployment_id = str(uuid_utils.uuid7())
     deployment_path = f"./deployments/{deployment_id}"
     
     # Create deployment record
@@ -480,56 +591,114 @@ async def deploy_agent(deployment: DeploymentCreate, db: Session = Depends(get_d
         deployment_path=deployment_path
     )
     db.add(db_deployment)
-    db.commit()
+    await db.commit()
     
-    # Create deployment in background
-    asyncio.create_task(deploy_agent_task(deployment_id, agent, db))
+    # Create deployment in background; the task opens its own session since
+    # the request-scoped one is closed once this response is sent
+    task = asyncio.create_task(deploy_agent_task(deployment_id, deployment.agent_id))
+    deployment_tasks.add(task)
+    task.add_done_callback(deployment_tasks.discard)
     
     return {"deployment_id": deployment_id, "status": "deploying"}
 
-async def deploy_agent_task(deployment_id: str, agent, db: Session):
+# Keep references to running deployments so they aren't garbage collected
+deployment_tasks = set()
+
+async def run_logged_subprocess(*cmd: str):
+    """Run a command without blocking the event loop, streaming its output to the logs channel"""
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT
+    )
     try:
+        async for line in proc.stdout:
+            await manager.broadcast_log(line.decode(errors="replace").rstrip())
+        returncode = await proc.wait()
+    finally:
+        # Don't leave the process running if reading its output failed
+        if proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+            await proc.wait()
+    
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+async def set_deployment_status(deployment_id: str, status: str, port: Optional[int] = None):
+    db = SessionLocal()
+    try:
+        deployment = await db.scalar(_deployment_by_id_stmt, {"did": deployment_id})
+        deployment.status = status
+        if port is not None:
+            deployment.port = port
+        await db.commit()
+    finally:
+        await SessionLocal.remove()
+
+async def deploy_agent_task(deployment_id: str, agent_id: str):
+    try:
+        # Read what the deployment needs, then give the connection back to
+        # the pool before the long-running venv and package installs
+        db = SessionLocal()
+        try:
+            agent = await db.scalar(_agent_with_tools_by_id_stmt, {"aid": agent_id})
+            
+            # Base package for Google ADK, plus the MCP packages
+            packages = ["google-adk"]
+            for assoc in agent.mcp_associations:
+                packages.append(assoc.mcp_tool.package_name)
+            
+            agent_script = generate_agent_script(agent)
+        finally:
+            await SessionLocal.remove()
+        
         deployment_path = f"./deployments/{deployment_id}"
         os.makedirs(deployment_path, exist_ok=True)
         
-        # Create virtual environment
-        subprocess.run([sys.executable, "-m", "venv", f"{deployment_path}/venv"], check=True)
+        venv_path = f"{deployment_path}/venv"
+        python_path = f"{venv_path}/bin/python" if os.name != 'nt' else f"{venv_path}/Scripts/python"
         
-        # Install required packages
-        pip_path = f"{deployment_path}/venv/bin/pip" if os.name != 'nt' else f"{deployment_path}/venv/Scripts/pip"
-        
-        packages = ["google-adk"]  # Base package for Google ADK
+        # Prefer uv (parallel downloads, shared package cache) when it is installed
+        uv_path = shutil.which("uv")
         
-        # Add MCP packages
-        for assoc in agent.mcp_associations:
-            packages.append(assoc.mcp_tool.package_name)
+        # Create virtual environment
+        await manager.broadcast_log(f"Creating virtual environment for deployment {deployment_id}")
+        if uv_path:
+            await run_logged_subprocess(uv_path, "venv", "--python", sys.executable, venv_path)
+        else:
+            await run_logged_subprocess(sys.executable, "-m", "venv", venv_path)
         
-        subprocess.run([pip_path, "install"] + packages, check=True)
+        # Install required packages
+        await manager.broadcast_log(f"Installing packages: {', '.join(packages)}")
+        if uv_path:
+            await run_logged_subprocess(uv_path, "pip", "install", "--python", python_path, *packages)
+        else:
+            pip_path = f"{venv_path}/bin/pip" if os.name != 'nt' else f"{venv_path}/Scripts/pip"
+            await run_logged_subprocess(pip_path, "install", *packages)
         
         # Create agent script
-        agent_script = generate_agent_script(agent)
         with open(f"{deployment_path}/agent.py", "w") as f:
             f.write(agent_script)
         
         # Update deployment status
-        deployment = db.query(Deployment).filter(Deployment.deployment_id == deployment_id).first()
-        deployment.status = "running"
-        deployment.port = 8100  # You can make this dynamic
-        db.commit()
+        await set_deployment_status(deployment_id, "running", port=8100)  # You can make the port dynamic
         
         # Start agent
-        python_path = f"{deployment_path}/venv/bin/python" if os.name != 'nt' else f"{deployment_path}/venv/Scripts/python"
         subprocess.Popen([python_path, f"{deployment_path}/agent.py"])
+        await manager.broadcast_log(f"Deployment {deployment_id} is running on port 8100")
         
     except Exception as e:
         logger.error(f"Deployment failed: {str(e)}")
-        deployment = db.query(Deployment).filter(Deployment.deployment_id == deployment_id).first()
-        deployment.status = "error"
-        db.commit()
+        await manager.broadcast_log(f"Deployment {deployment_id} failed: {str(e)}", level="error")
+        await set_deployment_status(deployment_id, "error")
 
-def generate_agent_script(agent):
-    # Generate Python script for agent based on Google ADK
-    script = f'''
+# Compiled once at import; rendering walks the precompiled template.
+# User-supplied values go through the `py` filter, which emits a Python
+# string literal so quotes and newlines cannot break out of it.
+AGENT_SCRIPT_TEMPLATE = '''
 import os
 from google.genai import Client, Model
 from google.genai.tools import Tool
@@ -541,44 +710,52 @@ os.environ["APIGEE_URL"] = "https://apigee.example.com"
 os.environ["USE_API_GATEWAY"] = "true"
 
 # Agent configuration
-os.environ["USECASE_ID"] = "{agent.usecase_id or ''}"
-os.environ["API_KEY"] = "{agent.api_key or ''}"
-os.environ["CONSUMER_KEY"] = "{agent.consumer_key or ''}"
-os.environ["CONSUMER_SECRET"] = "{agent.consumer_secret or ''}"
+os.environ["USECASE_ID"] = {{ agent.usecase_id | py }}
+os.environ["API_KEY"] = {{ agent.api_key | py }}
+os.environ["CONSUMER_KEY"] = {{ agent.consumer_key | py }}
+os.environ["CONSUMER_SECRET"] = {{ agent.consumer_secret | py }}
 
 # Initialize client
 client = Client()
 
 # Create agent
 agent = client.agents.create(
-    name="{agent.name}",
-    model="{agent.model_name}",
-    system_instruction="""{agent.instruction}""",
+    name={{ agent.name | py }},
+    model={{ agent.model_name | py }},
+    system_instruction={{ agent.instruction | py }},
     tools=[]
 )
 
 # Add MCP tools
-'''
-    
-    for assoc in agent.mcp_associations:
-        # Add env variables for each tool
-        for env_name, env_value in assoc.env_values.items():
-            script += f'os.environ["{env_name}"] = "{env_value}"\n'
-        
-        script += f'''
-# Import and add {assoc.mcp_tool.name}
+{% for assoc in assocs %}
+{% for env_name, env_value in assoc.env_values.items() %}
+os.environ[{{ env_name | py }}] = {{ env_value | py }}
+{% endfor %}
+
+# Import and add {{ assoc.mcp_tool.name | py }}
 # Tool implementation would go here
-'''
-    
-    script += '''
+{% endfor %}
+
 # Start chat interface
 if __name__ == "__main__":
     print(f"Agent {agent.name} is running on port 8100")
     # Start web server for chat UI
     # Implementation would go here
 '''
-    
-    return script
+
+_agent_script_env = Environment(
+    autoescape=False,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    keep_trailing_newline=True,
+)
+_agent_script_env.filters["py"] = lambda value: repr("" if value is None else str(value))
+
+_agent_script_template = _agent_script_env.from_string(AGENT_SCRIPT_TEMPLATE)
+
+def generate_agent_script(agent):
+    # Generate Python script for agent based on Google ADK
+    return _agent_script_template.render(agent=agent, assocs=agent.mcp_associations)
 
 # WebSocket for logs
 @app.websocket("/ws/logs/{client_id}")
@@ -591,21 +768,28 @@ async def websocket_logs(websocket: WebSocket, client_id: str):
         manager.disconnect(client_id)
 
 # Remote Configuration
-@app.post("/api/remote-configs")
-def create_remote_config(config: RemoteConfigCreate, db: Session = Depends(get_db)):
+@app.post("/api/remote-configs", status_code=201)
+async def create_remote_config(config: RemoteConfigCreate, db: AsyncSession = Depends(get_db)):
     db_config = RemoteConfig(**config.dict())
     db.add(db_config)
-    db.commit()
-    db.refresh(db_config)
-    return db_config
+    await db.commit()
+    return ORJSONResponse(status_code=201, content={
+        "id": db_config.id,
+        "name": db_config.name,
+        "host": db_config.host,
+        "port": db_config.port,
+        "username": db_config.username,
+        "ssh_key_path": db_config.ssh_key_path,
+        "created_at": db_config.created_at
+    })
 
 @app.get("/api/remote-configs")
-def list_remote_configs(db: Session = Depends(get_db)):
-    return db.query(RemoteConfig).all()
+async def list_remote_configs(db: AsyncSession = Depends(get_db)):
+    return (await db.scalars(select(RemoteConfig))).all()
 
 # Health check
 @app.get("/api/health")
-def health_check():
+async def health_check():
     return {"status": "healthy"}
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+# serializers.py
+"""
+Hot-path response builders.
+
+Plain Python, but written so Cython can compile it in place for faster
+dict building (see setup.py):
+
+    pip install cython
+    python setup.py build_ext --inplace
+
+The compiled extension takes precedence over this file on import.
+"""
+from typing import Any, Dict, List
+
+
+def agent_rows_to_dicts(rows) -> List[Dict[str, Any]]:
+    """Group flat agent/association rows into AgentResponse-shaped dicts
+
+    Rows must have the column order of main._agent_rows_stmt: the agent
+    columns, then association id and env values, then tool id, name and
+    package name. Rows are unpacked positionally to skip per-field
+    attribute lookups.
+    """
+    result: list = []
+    agents_by_id: dict = {}
+    agent_dict: dict
+    for (agent_pk, agent_id, name, instruction, model_name, agent_type, usecase_id,
+         position_x, position_y, created_at, association_id, env_values,
+         mcp_tool_id, mcp_tool_name, package_name) in rows:
+        agent_dict = agents_by_id.get(agent_pk)
+        if agent_dict is None:
+            agent_dict = {
+                "id": agent_pk,
+                "agent_id": agent_id,
+                "name": name,
+                "instruction": instruction,
+                "model_name": model_name,
+                "agent_type": agent_type,
+                "usecase_id": usecase_id,
+                "position_x": position_x,
+                "position_y": position_y,
+                "created_at": created_at,
+                "mcp_tools": []
+            }
+            agents_by_id[agent_pk] = agent_dict
+            result.append(agent_dict)
+
+        if association_id is not None:
+            agent_dict["mcp_tools"].append({
+                "association_id": association_id,
+                "mcp_tool": {
+                    "id": mcp_tool_id,
+                    "name": mcp_tool_name,
+                    "package_name": package_name
+                },
+                "env_values": env_values
+            })
+
+    return result
@@ -0,0 +1,10 @@
+# setup.py
+# Optional: compile the hot serializers with Cython
+#   python setup.py build_ext --inplace
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="agent-platform-serializers",
+    ext_modules=cythonize("serializers.py", language_level=3),
+)
@@ -0,0 +1,33 @@
+# conftest.py
+import asyncio
+import os
+import sys
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The engine resolves its relative database path on import, so import from
+# a scratch directory to keep the tests off the real database
+_cwd = os.getcwd()
+os.chdir(tempfile.mkdtemp(prefix="agent-platform-tests-"))
+try:
+    import main
+finally:
+    os.chdir(_cwd)
+
+
+async def drop_tables():
+    async with main.engine.begin() as conn:
+        await conn.run_sync(main.Base.metadata.drop_all)
+    await main.engine.dispose()
+
+
+@pytest.fixture
+def client():
+    asyncio.run(drop_tables())
+    main._agent_response_cache.clear()
+    with TestClient(main.app) as test_client:
+        yield test_client
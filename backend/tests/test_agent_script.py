@@ -0,0 +1,33 @@
+# test_agent_script.py
+import ast
+from types import SimpleNamespace
+
+from main import generate_agent_script
+
+
+def test_generated_script_keeps_user_values_in_string_literals():
+    tool = SimpleNamespace(name="Mail\nimport evil")
+    agent = SimpleNamespace(
+        name='x"; import os; os.system("id"); "',
+        instruction='Reply """\nprint("injected")\n"""',
+        model_name="gpt-4",
+        usecase_id=None,
+        api_key="key'",
+        consumer_key=None,
+        consumer_secret="secret",
+        mcp_associations=[SimpleNamespace(env_values={'TOKEN"] = "': "a\nb"}, mcp_tool=tool)]
+    )
+
+    tree = ast.parse(generate_agent_script(agent))
+
+    calls = [node for node in ast.walk(tree) if isinstance(node, ast.Call)]
+    assert [ast.unparse(call.func) for call in calls] == [
+        "Client", "client.agents.create", "print"
+    ]
+    create = calls[1]
+    assert {keyword.arg: ast.literal_eval(keyword.value) for keyword in create.keywords} == {
+        "name": agent.name,
+        "model": "gpt-4",
+        "system_instruction": agent.instruction,
+        "tools": []
+    }
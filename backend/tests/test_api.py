@@ -0,0 +1,160 @@
+# test_api.py
+"""
+The agent and MCP tool endpoints return ORJSONResponse directly and skip
+response-model validation, so the payload shapes are checked here.
+"""
+import main
+from main import AgentResponse, MCPToolResponse
+
+
+def create_tool(client, name="Email", env_variables=("API_KEY", "BASE_URL")):
+    response = client.post("/api/mcp-tools", json={
+        "name": name,
+        "package_name": "mcp-email-tool",
+        "description": "Sends email",
+        "env_variables": list(env_variables)
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+def create_agent(client, name="Support"):
+    response = client.post("/api/agents", json={
+        "name": name,
+        "instruction": "Help the user",
+        "model_name": "gpt-4"
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_create_mcp_tool_matches_response_model(client):
+    tool = create_tool(client)
+    assert MCPToolResponse(**tool).env_variables == ["API_KEY", "BASE_URL"]
+
+    listed = client.get("/api/mcp-tools").json()
+    assert [MCPToolResponse(**item).id for item in listed] == [tool["id"]]
+
+
+def test_create_agent_matches_response_model(client):
+    agent = create_agent(client)
+    assert AgentResponse(**agent).mcp_tools == []
+    assert "api_key" not in agent
+
+
+def test_list_and_get_agent_match_response_model(client):
+    tool = create_tool(client)
+    agent = create_agent(client)
+    create_agent(client, name="Billing")
+    response = client.post(f"/api/agents/{agent['agent_id']}/mcp-tools", json={
+        "mcp_tool_id": tool["id"],
+        "env_values": {"API_KEY": "key", "BASE_URL": "https://example.com"}
+    })
+    assert response.status_code == 200
+
+    listed = client.get("/api/agents").json()
+    assert [AgentResponse(**item).name for item in listed] == ["Support", "Billing"]
+
+    fetched = client.get(f"/api/agents/{agent['agent_id']}")
+    assert fetched.status_code == 200
+    payload = AgentResponse(**fetched.json())
+    assert payload.mcp_tools == [{
+        "association_id": response.json()["association_id"],
+        "mcp_tool": {"id": tool["id"], "name": "Email", "package_name": "mcp-email-tool"},
+        "env_values": {"API_KEY": "key", "BASE_URL": "https://example.com"}
+    }]
+
+    assert client.get("/api/agents/missing").status_code == 404
+
+
+def test_get_agent_reflects_update(client):
+    agent = create_agent(client)
+    assert client.get(f"/api/agents/{agent['agent_id']}").json()["name"] == "Support"
+
+    response = client.put(f"/api/agents/{agent['agent_id']}", json={
+        "name": "Renamed",
+        "instruction": "Help the user",
+        "model_name": "gpt-4"
+    })
+    assert response.status_code == 200
+    assert client.get(f"/api/agents/{agent['agent_id']}").json()["name"] == "Renamed"
+
+
+def test_add_mcp_to_agent_not_found(client):
+    tool = create_tool(client)
+    agent = create_agent(client)
+
+    response = client.post("/api/agents/missing/mcp-tools", json={"mcp_tool_id": tool["id"], "env_values": {}})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Agent not found"
+
+    response = client.post(f"/api/agents/{agent['agent_id']}/mcp-tools", json={"mcp_tool_id": 999, "env_values": {}})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "MCP tool not found"
+
+
+def test_add_mcp_to_agent_duplicate(client):
+    tool = create_tool(client, env_variables=())
+    agent = create_agent(client)
+    url = f"/api/agents/{agent['agent_id']}/mcp-tools"
+
+    assert client.post(url, json={"mcp_tool_id": tool["id"], "env_values": {}}).status_code == 200
+    response = client.post(url, json={"mcp_tool_id": tool["id"], "env_values": {}})
+    assert response.status_code == 409
+
+
+def test_add_mcp_to_agent_invalid_env_values(client):
+    tool = create_tool(client)
+    agent = create_agent(client)
+    url = f"/api/agents/{agent['agent_id']}/mcp-tools"
+
+    missing = client.post(url, json={"mcp_tool_id": tool["id"], "env_values": {"API_KEY": "key"}})
+    assert missing.status_code == 422
+    assert "BASE_URL" in missing.json()["detail"]
+
+    extra = client.post(url, json={
+        "mcp_tool_id": tool["id"],
+        "env_values": {"API_KEY": "key", "BASE_URL": "url", "OTHER": "x"}
+    })
+    assert extra.status_code == 422
+    assert "OTHER" in extra.json()["detail"]
+
+    empty = client.post(url, json={"mcp_tool_id": tool["id"], "env_values": {"API_KEY": " ", "BASE_URL": "url"}})
+    assert empty.status_code == 422
+    assert "API_KEY" in empty.json()["detail"]
+
+    assert client.get(f"/api/agents/{agent['agent_id']}").json()["mcp_tools"] == []
+
+
+def test_add_mcp_to_agent_uses_recreated_tool_env_variables(client):
+    # SQLite reuses the id of a deleted row, so a recreated tool must not
+    # be validated against the old tool's variables
+    old_tool = create_tool(client)
+    assert client.delete(f"/api/mcp-tools/{old_tool['id']}").status_code == 200
+    tool = create_tool(client, env_variables=("TOKEN",))
+    agent = create_agent(client)
+
+    response = client.post(f"/api/agents/{agent['agent_id']}/mcp-tools", json={
+        "mcp_tool_id": tool["id"],
+        "env_values": {"TOKEN": "secret"}
+    })
+    assert response.status_code == 200
+
+
+def test_get_agent_skips_cache_when_written_during_read(client, monkeypatch):
+    agent = create_agent(client)
+    serialize = main.agent_rows_to_dicts
+
+    def serialize_then_write(rows):
+        # Stands in for an update that commits while the read is in flight
+        result = serialize(rows)
+        main.invalidate_agent_response(agent["agent_id"])
+        return result
+
+    monkeypatch.setattr(main, "agent_rows_to_dicts", serialize_then_write)
+    assert client.get(f"/api/agents/{agent['agent_id']}").status_code == 200
+    assert agent["agent_id"] not in main._agent_response_cache
+
+    monkeypatch.setattr(main, "agent_rows_to_dicts", serialize)
+    assert client.get(f"/api/agents/{agent['agent_id']}").status_code == 200
+    assert agent["agent_id"] in main._agent_response_cache
@@ -216,8 +216,10 @@ const useWebSocket = (url: string): WebSocketHookResult => {
       ws.onmessage = (event: MessageEvent) => {
         if (ws === wsRef.current && mountedRef.current) {
           try {
-            const log = JSON.parse(event.data) as LogEntry;
-            setLogs(prev => [...prev, log].slice(-100)); // Keep last 100 logs
+            // The backend batches log entries, so a frame may carry several
+            const data = JSON.parse(event.data) as LogEntry | LogEntry[];
+            const entries = Array.isArray(data) ? data : [data];
+            setLogs(prev => [...prev, ...entries].slice(-100)); // Keep last 100 logs
           } catch (error) {
             console.error('Error parsing message:', error);
           }